@@ -1,15 +1,35 @@
 from mcp.server.fastmcp import FastMCP
-from PyPDF2 import PdfReader
-from pyhanko.pdf_utils.incremental_writer import IncrementalPdfFileWriter
-from pyhanko.sign.fields import SigFieldSpec, append_signature_field
+from pdf_state import acro_form_fields, iter_sig_fields, open_reader, parse_signature_state, read_bytes, state_from_reader
+from concurrent.futures import ProcessPoolExecutor
+from concurrent.futures.process import BrokenProcessPool
+from pathlib import Path
+import errno
+import io
+import json
 import os
-import glob
+import pickle
 import shutil
 
 mcp = FastMCP("esignature-validator")
 
 PDF_DOCUMENTS_DIR = "pdf_documents"
 ORGANIZED_FOLDERS_DIR = "organized_pdfs"
+STATE_CACHE_FILE = os.path.join(ORGANIZED_FOLDERS_DIR, ".state_cache.json")
+
+# The signature field add_signature_field puts on the first page
+SIG_FIELD_NAME = "Kevin's Signature"
+SIG_FIELD_BOX = (400, 50, 600, 100)
+
+# path -> [mtime_ns, size, state], loaded lazily from STATE_CACHE_FILE
+_state_cache = None
+# whether _state_cache has changes that aren't in STATE_CACHE_FILE yet
+_state_cache_dirty = False
+
+# pyhanko SigFieldSpec for SIG_FIELD_NAME, built on first use since it never changes
+_sig_field_spec = None
+
+# The PdfSession of the last PDF a tool looked at
+_last_session = None
 
 ### HELP FUNCTIONS ###
 
@@ -30,23 +50,215 @@ def find_file_in_organized_folders(filename):
     return None
 
 
+def _list_pdfs(folder_path):
+    """Helper function to list the PDF files in a folder by name (empty if the folder doesn't exist)"""
+    try:
+        with os.scandir(folder_path) as entries:
+            # skip dotfiles like glob("*.pdf") did, e.g. macOS "._name.pdf" AppleDouble files
+            return sorted(
+                entry.path for entry in entries
+                if entry.name.endswith(".pdf") and not entry.name.startswith(".") and entry.is_file()
+            )
+    except FileNotFoundError:
+        return []
+
+
+def _fast_move(src, dst):
+    """Helper function to move a file with a single rename, only copying when it has to cross filesystems"""
+    try:
+        os.replace(src, dst)
+    except OSError as e:
+        if e.errno == errno.EXDEV:
+            shutil.move(src, dst)
+        else:
+            raise
+
+
+class PdfSession:
+    """A PDF's bytes and parsed reader, kept so tools run back to back on the same file don't re-read or re-parse it"""
+    
+    def __init__(self, pdf_path):
+        self.path = os.path.normpath(pdf_path)
+        self.stamp = _file_stamp(pdf_path)
+        self.data = read_bytes(pdf_path)
+        self._reader = None
+    
+    @property
+    def reader(self):
+        if self._reader is None:
+            self._reader = open_reader(self.data)
+        return self._reader
+    
+    def writer(self):
+        """A new incremental writer over the session's bytes (pyhanko writers can only be written once)"""
+        # pyhanko pulls in cryptography & co, only load it when a tool actually writes
+        from pyhanko.pdf_utils.incremental_writer import IncrementalPdfFileWriter
+        return IncrementalPdfFileWriter(io.BytesIO(self.data))
+
+
+def _open_session(pdf_path):
+    """Helper function to get a session for a PDF, reusing the last one if the file hasn't changed since"""
+    global _last_session
+    if (_last_session is None
+            or _last_session.path != os.path.normpath(pdf_path)
+            or _last_session.stamp != _file_stamp(pdf_path)):
+        _last_session = PdfSession(pdf_path)
+    return _last_session
+
+
+def _get_state_cache():
+    """Helper function to load the persisted signature state cache on first use"""
+    global _state_cache
+    if _state_cache is None:
+        try:
+            _state_cache = json.loads(Path(STATE_CACHE_FILE).read_text())
+        except (OSError, ValueError):
+            _state_cache = {}
+    return _state_cache
+
+
+def _save_state_cache():
+    """Helper function to persist the signature state cache so restarts don't re-parse every PDF"""
+    global _state_cache_dirty
+    if not _state_cache_dirty:
+        return
+    
+    # Write to a temp file and swap it in, so a crash mid-write never leaves a half written cache
+    tmp_path = STATE_CACHE_FILE + ".tmp"
+    try:
+        Path(tmp_path).write_text(json.dumps(_get_state_cache()))
+        os.replace(tmp_path, STATE_CACHE_FILE)
+    except OSError:
+        # the cache is only an optimization, never fail a tool over it
+        return
+    _state_cache_dirty = False
+
+
+def _file_stamp(pdf_path):
+    """Helper function to get the (mtime_ns, size) pair a cached state is only valid for"""
+    st = os.stat(pdf_path)
+    return [st.st_mtime_ns, st.st_size]
+
+
+def _remember_state(pdf_path, state):
+    """Helper function to record the signature state of a PDF as it is on disk right now"""
+    global _state_cache_dirty
+    _get_state_cache()[os.path.normpath(pdf_path)] = _file_stamp(pdf_path) + [state]
+    _state_cache_dirty = True
+
+
+def _forget_state(pdf_path):
+    """Helper function to drop the cached state of a PDF that was moved or removed"""
+    global _state_cache_dirty
+    if _get_state_cache().pop(os.path.normpath(pdf_path), None) is not None:
+        _state_cache_dirty = True
+
+
+def _prune_state_cache(folder_path, pdf_paths):
+    """Helper function to drop cached states for files in a folder that are no longer there,
+    e.g. ones deleted or moved by hand. pdf_paths is what's in the folder right now"""
+    global _state_cache_dirty
+    cache = _get_state_cache()
+    folder_path = os.path.normpath(folder_path)
+    present = {os.path.normpath(path) for path in pdf_paths}
+    
+    stale = [path for path in cache if os.path.dirname(path) == folder_path and path not in present]
+    for path in stale:
+        del cache[path]
+    if stale:
+        _state_cache_dirty = True
+
+
+def _get_sig_field_spec():
+    """Helper function to get the signature field spec, only building it (and importing pyhanko) once"""
+    global _sig_field_spec
+    if _sig_field_spec is None:
+        from pyhanko.sign.fields import SigFieldSpec
+        _sig_field_spec = SigFieldSpec(
+            sig_field_name=SIG_FIELD_NAME,
+            box=SIG_FIELD_BOX,
+            on_page=0
+        )
+    return _sig_field_spec
+
+
+def _parse_in_pool(paths):
+    """Helper function to parse PDFs in worker processes, one worker per chunk at most and only for this batch.
+    Returns None if the pool itself can't be used, errors from parsing a PDF are raised as is"""
+    workers = min(os.cpu_count() or 1, (len(paths) + 3) // 4)
+    executor = None
+    try:
+        try:
+            executor = ProcessPoolExecutor(max_workers=workers)
+            # submitting the work is what starts the worker processes
+            results = executor.map(parse_signature_state, paths, chunksize=4)
+        except OSError:
+            return None
+        
+        try:
+            return list(results)
+        except (BrokenProcessPool, pickle.PicklingError):
+            return None
+    finally:
+        if executor is not None:
+            executor.shutdown(cancel_futures=True)
+
+
 def analyze_signature_state(pdf_path):
-    """Helper function to analyze PDF signature state and return the appropriate folder name"""
-    reader = PdfReader(pdf_path)
-    fields = reader.get_fields()
+    """Helper function to get the signature state folder name, only parsing PDFs that changed since last time"""
+    return analyze_signature_states([pdf_path])[0]
+
+
+def analyze_signature_states(pdf_paths):
+    """Helper function to get the signature state of several PDFs, parsing the changed ones in parallel"""
+    global _state_cache_dirty
+    cache = _get_state_cache()
+    states = [None] * len(pdf_paths)
+    to_parse = []
+    
+    for i, pdf_path in enumerate(pdf_paths):
+        stamp = _file_stamp(pdf_path)
+        cached = cache.get(os.path.normpath(pdf_path))
+        if cached and cached[:2] == stamp:
+            states[i] = cached[2]
+        else:
+            to_parse.append((i, stamp))
+    
+    paths = [pdf_paths[i] for i, _ in to_parse]
+    # Parsing is CPU bound, but starting worker processes isn't free, so only
+    # fan out when there's more than one chunk of work
+    if len(paths) > 4:
+        parsed = _parse_in_pool(paths)
+        if parsed is None:
+            # the pool itself failed, not the parsing, so just parse here
+            parsed = [parse_signature_state(path) for path in paths]
+    else:
+        parsed = [state_from_reader(_open_session(path).reader) for path in paths]
     
-    # Look for the first signature field
-    for field_name, field_data in fields.items():
-        field_type = field_data.get('/FT') # /FT is the field type
-        if field_type == '/Sig':
-            # Found a signature field. now just check if its signed
-            if '/V' in field_data and field_data['/V']: # first part checks if the field has a value, second part checks if the value is not empty
-                return "signed"
-            else:
-                return "unsigned_fields"
+    for (i, stamp), state in zip(to_parse, parsed):
+        cache[os.path.normpath(pdf_paths[i])] = stamp + [state]
+        states[i] = state
     
-    # No signature fields found
-    return "no_signature_fields"
+    if to_parse:
+        _state_cache_dirty = True
+    
+    return states
+
+
+def _iter_report(moved_files, remaining_files):
+    """Helper function to yield the lines of the check_unsigned_folder_for_updates result message"""
+    if moved_files:
+        yield f"Moved {len(moved_files)} signed document(s) to signed folder:"
+        for filename in moved_files:
+            yield f"  - {filename}"
+    
+    if remaining_files:
+        yield f"{len(remaining_files)} document(s) still awaiting signature:"
+        for filename in remaining_files:
+            yield f"  - {filename}"
+    
+    if not moved_files and not remaining_files:
+        yield "No documents found in unsigned_fields folder"
 
 
 ### RESOURCES ###
@@ -54,7 +266,7 @@ def analyze_signature_state(pdf_path):
 @mcp.resource("pdf://documents")
 def get_pdf_documents():
     """Expose PDF documents directory as a resource"""
-    pdf_files = glob.glob(os.path.join(PDF_DOCUMENTS_DIR, "*.pdf"))
+    pdf_files = _list_pdfs(PDF_DOCUMENTS_DIR)
     return {
         "name": "PDF Documents",
         "description": f"PDF files in {PDF_DOCUMENTS_DIR} directory",
@@ -71,7 +283,7 @@ def get_organized_pdfs():
     
     for folder in folders:
         folder_path = os.path.join(ORGANIZED_FOLDERS_DIR, folder)
-        pdf_files = glob.glob(os.path.join(folder_path, "*.pdf"))
+        pdf_files = _list_pdfs(folder_path)
         folder_contents[folder] = [os.path.basename(f) for f in pdf_files]
     
     return {
@@ -87,37 +299,31 @@ def get_organized_pdfs():
 @mcp.tool()
 def analyze_pdf_signatures(path: str) -> str:
     """Comprehensive analysis of PDF signatures - checks for fields, extracts signer info, and validates signatures."""
-    reader = PdfReader(path)
-    fields = reader.get_fields()
+    reader = _open_session(path).reader
+    fields = acro_form_fields(reader)
     
     if not fields:
         return "No form fields found"
     
-    # Find all signature fields in the PDF
-    sig_fields = []
-    for field_name, field_data in fields.items():
-        field_type = field_data.get('/FT')
-        if field_type == '/Sig':
-            sig_fields.append(field_name)
+    # Find all signature fields in the PDF, without resolving the rest of the form
+    sig_fields = list(iter_sig_fields(fields))
     
     if not sig_fields:
         return "No signature fields found"
     
-    result = [f"Signature fields: {', '.join(sig_fields)}"]
+    result = [f"Signature fields: {', '.join(str(field_name) for field_name, _ in sig_fields)}"]
     
     # Since we assume only 1 signature field
-    field_name = sig_fields[0]
-    field_data = fields[field_name]
+    field_name, field_data = sig_fields[0]
     
-    if '/V' in field_data and field_data['/V']:
+    sig_dict = field_data['/V'] if '/V' in field_data else None
+    if sig_dict:
         # It's signed
-        sig_dict = field_data['/V']
-        info = f"Field '{field_name}':"
-        if '/Name' in sig_dict:
-            info += f" {sig_dict['/Name']}"
-        if '/M' in sig_dict:
-            info += f" ({sig_dict['/M']})"
-        result.append(info)
+        signer = sig_dict.get('/Name')
+        signed_at = sig_dict.get('/M')
+        signer_info = f" {signer}" if signer is not None else ""
+        date_info = f" ({signed_at})" if signed_at is not None else ""
+        result.append(f"Field '{field_name}':{signer_info}{date_info}")
         result.append("✓ 1 field(s) signed")
     else:
         result.append("No fields are signed")
@@ -151,7 +357,13 @@ def organize_pdf_by_signature_state(file_path: str, base_folder: str = None) ->
     filename = os.path.basename(file_path)
     destination = os.path.join(base_folder, state, filename)
     
-    shutil.move(file_path, destination)
+    _fast_move(file_path, destination)
+    _forget_state(file_path)
+    _remember_state(destination, state)
+    # also drop entries for files removed from the destination folder by hand
+    destination_folder = os.path.dirname(destination)
+    _prune_state_cache(destination_folder, _list_pdfs(destination_folder))
+    _save_state_cache()
     
     return f"Moved {filename} to {state} folder (State: {state})"
 
@@ -173,22 +385,23 @@ def add_signature_field(input_path: str, output_path: str = None) -> str:
         output_path = os.path.join(ORGANIZED_FOLDERS_DIR, "unsigned_fields", filename)
     
     # Add signature field
-    with open(input_path, 'rb') as inf:
-        writer = IncrementalPdfFileWriter(inf)
-        sig_field_spec = SigFieldSpec(
-            sig_field_name="Kevin's Signature",
-            box=(400, 50, 600, 100),
-            on_page=0
-        )
-        append_signature_field(writer, sig_field_spec)
-        with open(output_path, 'wb') as outf:
-            writer.write(outf)
+    from pyhanko.sign.fields import append_signature_field
+    writer = _open_session(input_path).writer()
+    append_signature_field(writer, _get_sig_field_spec())
+    
+    # Write the output in one go instead of many small writes
+    out = io.BytesIO()
+    writer.write(out)
+    Path(output_path).write_bytes(out.getvalue())
     
     # Remove original file if it was in an organized folder
     if input_path != output_path and os.path.exists(input_path):
         os.remove(input_path)
+        _forget_state(input_path)
+    _forget_state(output_path)
+    _save_state_cache()
     
-    return f"Signature field Kevin's Signature added to {os.path.basename(output_path)} and moved to unsigned_fields folder"
+    return f"Signature field {SIG_FIELD_NAME} added to {os.path.basename(output_path)} and moved to unsigned_fields folder"
 
 
 @mcp.tool()
@@ -198,43 +411,38 @@ def check_unsigned_folder_for_updates() -> str:
     unsigned_folder = os.path.join(ORGANIZED_FOLDERS_DIR, "unsigned_fields")
     
     # Get all PDF files in the unsigned_fields folder
-    pdf_files = glob.glob(os.path.join(unsigned_folder, "*.pdf"))
+    pdf_files = _list_pdfs(unsigned_folder)
+    _prune_state_cache(unsigned_folder, pdf_files)
     
     if not pdf_files:
+        _save_state_cache()
         return "No PDF files found in unsigned_fields folder"
     
     moved_files = []
     remaining_files = []
     
-    for pdf_file in pdf_files:
-        # Analyze the PDF to check if it's now signed
-        state = analyze_signature_state(pdf_file)
-        
+    # Analyze all the PDFs up front to check which are now signed
+    states = analyze_signature_states(pdf_files)
+    
+    for pdf_file, state in zip(pdf_files, states):
         if state == "signed":
             # Document is signed! Move it to signed folder
             filename = os.path.basename(pdf_file)
             destination = os.path.join(ORGANIZED_FOLDERS_DIR, "signed", filename)
             
-            shutil.move(pdf_file, destination)
+            _fast_move(pdf_file, destination)
+            _forget_state(pdf_file)
+            _remember_state(destination, state)
             moved_files.append(filename)
         else:
             # Document is not signed
             remaining_files.append(os.path.basename(pdf_file))
     
-    # Build the result message
-    result = []
-    
     if moved_files:
-        result.append(f"Moved {len(moved_files)} signed document(s) to signed folder:")
-        for filename in moved_files:
-            result.append(f"  - {filename}")
-    
-    if remaining_files:
-        result.append(f"{len(remaining_files)} document(s) still awaiting signature:")
-        for filename in remaining_files:
-            result.append(f"  - {filename}")
-    
-    if not moved_files and not remaining_files:
-        result.append("No documents found in unsigned_fields folder")
+        # also drop entries for files removed from the signed folder by hand
+        signed_folder = os.path.join(ORGANIZED_FOLDERS_DIR, "signed")
+        _prune_state_cache(signed_folder, _list_pdfs(signed_folder))
+    _save_state_cache()
     
-    return "\n".join(result)
\ No newline at end of file
+    # Build the result message
+    return "\n".join(_iter_report(moved_files, remaining_files))
\ No newline at end of file
@@ -0,0 +1,71 @@
+"""Signature state parsing, kept in its own module so worker processes can import it"""
+from pypdf import PdfReader
+import io
+
+
+def read_bytes(pdf_path):
+    """Helper function to load a whole PDF into memory in one read, so parsing doesn't hit the disk per read"""
+    with open(pdf_path, 'rb') as f:
+        return f.read()
+
+
+def open_reader(data):
+    """Helper function to parse PDF bytes from read_bytes without touching the disk again"""
+    return PdfReader(io.BytesIO(data))
+
+
+def acro_form_fields(reader):
+    """Helper function to get the top-level /AcroForm /Fields array, or [] if the PDF has no form"""
+    acro_form = reader.trailer["/Root"].get("/AcroForm")
+    if not acro_form:
+        return []
+    return acro_form.get_object().get("/Fields", [])
+
+
+def iter_sig_fields(fields, parent_name=None, parent_type=None):
+    """Helper function to yield (name, field) for signature fields only, without resolving the rest of the form"""
+    for field_ref in fields:
+        field = field_ref.get_object()
+        field_type = field['/FT'] if '/FT' in field else parent_type # /FT is inherited from the parent field
+        if field_type is not None and field_type != '/Sig':
+            # text/button/choice field, don't bother looking at its kids
+            continue
+        
+        name = field.get('/T')
+        if parent_name and name:
+            name = f"{parent_name}.{name}"
+        elif parent_name:
+            name = parent_name
+        
+        # kids with a /T are child fields, kids without one are just widget annotations
+        child_fields = [kid for kid in field.get('/Kids', []) if '/T' in kid.get_object()]
+        if child_fields:
+            yield from iter_sig_fields(child_fields, name, field_type)
+        elif field_type == '/Sig':
+            yield name, field
+
+
+def parse_signature_state(pdf_path):
+    """Helper function to analyze PDF signature state and return the appropriate folder name"""
+    return state_from_reader(open_reader(read_bytes(pdf_path)))
+
+
+def state_from_reader(reader):
+    """Helper function to get the signature state folder name from an already opened PDF"""
+    fields = acro_form_fields(reader)
+    
+    # No form at all (the usual case for freshly imported PDFs), nothing more to parse.
+    # /SigFlags isn't used here: forms with empty signature fields often don't set it
+    if not fields:
+        return "no_signature_fields"
+    
+    # Look for the first signature field, we assume there's only 1 so stop there
+    for field_name, field_data in iter_sig_fields(fields):
+        # Found a signature field. now just check if its signed
+        if '/V' in field_data and field_data['/V']: # first part checks if the field has a value, second part checks if the value is not empty
+            return "signed"
+        else:
+            return "unsigned_fields"
+    
+    # No signature fields found
+    return "no_signature_fields"
@@ -0,0 +1,224 @@
+import importlib.util
+import json
+import os
+from pathlib import Path
+
+import pytest
+from concurrent.futures import ProcessPoolExecutor
+from pypdf import PdfReader, PdfWriter
+from pypdf.errors import PdfReadError
+from pypdf.generic import DictionaryObject, NameObject, TextStringObject
+
+SERVER_FILE = Path(__file__).resolve().parent.parent / "main.py"
+
+
+def load_server():
+    """Load main.py the way `mcp run main.py` does: parent dir on sys.path, module not in sys.modules"""
+    spec = importlib.util.spec_from_file_location("server_module", SERVER_FILE)
+    module = importlib.util.module_from_spec(spec)
+    spec.loader.exec_module(module)
+    return module
+
+
+def write_blank_pdf(path):
+    writer = PdfWriter()
+    writer.add_blank_page(612, 792)
+    writer.write(path)
+
+
+def sign_pdf(path):
+    """Give the signature field a /V value, which is all the server looks at"""
+    writer = PdfWriter(clone_from=PdfReader(path))
+    for field in writer._root_object["/AcroForm"]["/Fields"]:
+        field = field.get_object()
+        if field.get("/FT") == "/Sig":
+            field[NameObject("/V")] = DictionaryObject({
+                NameObject("/Name"): TextStringObject("Kevin"),
+                NameObject("/M"): TextStringObject("D:20260101000000Z"),
+            })
+    writer.write(path)
+
+
+@pytest.fixture
+def server(tmp_path, monkeypatch):
+    monkeypatch.chdir(tmp_path)
+    monkeypatch.syspath_prepend(str(SERVER_FILE.parent))
+    for folder in ["pdf_documents", "organized_pdfs/no_signature_fields",
+                   "organized_pdfs/unsigned_fields", "organized_pdfs/signed"]:
+        os.makedirs(folder)
+    return load_server()
+
+
+def add_unsigned(server, name):
+    write_blank_pdf(os.path.join("pdf_documents", name))
+    server.add_signature_field(name)
+    return os.path.join("organized_pdfs", "unsigned_fields", name)
+
+
+@pytest.fixture
+def pool_maps(server, monkeypatch):
+    """Record every executor.map call the server makes, so tests can tell the pool was really used"""
+    calls = []
+
+    class SpyPool(ProcessPoolExecutor):
+        def map(self, fn, *iterables, **kwargs):
+            calls.append(fn)
+            return super().map(fn, *iterables, **kwargs)
+
+    monkeypatch.setattr(server, "ProcessPoolExecutor", SpyPool)
+    return calls
+
+
+# parses done in this process, pool workers count in their own copy
+in_process_parses = []
+
+
+def counting_parse(pdf_path):
+    import pdf_state  # importable once the server fixture has put the repo on sys.path
+    in_process_parses.append(pdf_path)
+    return pdf_state.parse_signature_state(pdf_path)
+
+
+def test_check_unsigned_folder_moves_signed_documents_in_parallel(server, pool_maps):
+    # enough changed files to go through the worker pool
+    paths = [add_unsigned(server, f"doc{i}.pdf") for i in range(7)]
+    for path in paths[:3]:
+        sign_pdf(path)
+
+    result = server.check_unsigned_folder_for_updates()
+
+    assert pool_maps == [server.parse_signature_state]
+
+    assert "Moved 3 signed document(s) to signed folder:" in result
+    assert "4 document(s) still awaiting signature:" in result
+    assert sorted(os.listdir("organized_pdfs/signed")) == ["doc0.pdf", "doc1.pdf", "doc2.pdf"]
+
+
+def test_check_unsigned_folder_falls_back_when_the_pool_fails(server, monkeypatch):
+    def broken_pool(*args, **kwargs):
+        raise OSError("can't start worker processes")
+    monkeypatch.setattr(server, "ProcessPoolExecutor", broken_pool)
+
+    paths = [add_unsigned(server, f"doc{i}.pdf") for i in range(7)]
+    sign_pdf(paths[0])
+
+    result = server.check_unsigned_folder_for_updates()
+
+    assert "Moved 1 signed document(s) to signed folder:" in result
+    assert "6 document(s) still awaiting signature:" in result
+
+
+def test_check_unsigned_folder_does_not_reparse_after_a_worker_parse_error(server, pool_maps, monkeypatch):
+    monkeypatch.setattr(server, "parse_signature_state", counting_parse)
+    in_process_parses.clear()
+    for i in range(6):
+        add_unsigned(server, f"doc{i}.pdf")
+    Path("organized_pdfs/unsigned_fields/bad.pdf").write_bytes(b"%PDF-1.7\nnot really a pdf")
+
+    with pytest.raises(PdfReadError):
+        server.check_unsigned_folder_for_updates()
+
+    assert pool_maps == [counting_parse]
+    assert in_process_parses == []
+
+
+def test_check_unsigned_folder_sees_a_document_signed_right_before(server):
+    path = add_unsigned(server, "form.pdf")
+    assert "1 document(s) still awaiting signature:" in server.check_unsigned_folder_for_updates()
+
+    sign_pdf(path)
+
+    assert server.check_unsigned_folder_for_updates() == "Moved 1 signed document(s) to signed folder:\n  - form.pdf"
+
+
+def test_check_unsigned_folder_recovers_after_an_unreadable_pdf(server):
+    signed = add_unsigned(server, "s1.pdf")
+    sign_pdf(signed)
+    add_unsigned(server, "u1.pdf")
+    Path("organized_pdfs/unsigned_fields/bad.pdf").write_bytes(b"%PDF-1.7\nnot really a pdf")
+
+    with pytest.raises(PdfReadError):
+        server.check_unsigned_folder_for_updates()
+
+    os.remove("organized_pdfs/unsigned_fields/bad.pdf")
+
+    assert server.check_unsigned_folder_for_updates() == (
+        "Moved 1 signed document(s) to signed folder:\n"
+        "  - s1.pdf\n"
+        "1 document(s) still awaiting signature:\n"
+        "  - u1.pdf"
+    )
+
+
+def test_check_unsigned_folder_skips_dotfiles(server):
+    path = add_unsigned(server, "form.pdf")
+    sign_pdf(path)
+    # macOS AppleDouble metadata file, not a real PDF
+    Path("organized_pdfs/unsigned_fields/._form.pdf").write_bytes(b"\x00\x05\x16\x07")
+
+    assert server.check_unsigned_folder_for_updates() == "Moved 1 signed document(s) to signed folder:\n  - form.pdf"
+    assert server.get_organized_pdfs()["folders"]["unsigned_fields"] == []
+
+
+def test_analyze_pdf_signatures(server):
+    write_blank_pdf("pdf_documents/blank.pdf")
+    assert server.analyze_pdf_signatures("pdf_documents/blank.pdf") == "No form fields found"
+
+    path = add_unsigned(server, "form.pdf")
+    assert server.analyze_pdf_signatures(path) == "Signature fields: Kevin's Signature\nNo fields are signed"
+
+    sign_pdf(path)
+    assert server.analyze_pdf_signatures(path) == (
+        "Signature fields: Kevin's Signature\n"
+        "Field 'Kevin's Signature': Kevin (D:20260101000000Z)\n"
+        "✓ 1 field(s) signed"
+    )
+
+
+def test_organize_pdf_by_signature_state(server):
+    write_blank_pdf("pdf_documents/blank.pdf")
+
+    assert server.organize_pdf_by_signature_state("blank.pdf") == (
+        "Moved blank.pdf to no_signature_fields folder (State: no_signature_fields)"
+    )
+    assert os.path.exists("organized_pdfs/no_signature_fields/blank.pdf")
+
+
+def test_find_file_prefers_organized_folders(server):
+    write_blank_pdf("pdf_documents/doc.pdf")
+    assert server.find_file_in_organized_folders("doc.pdf") == os.path.join("pdf_documents", "doc.pdf")
+
+    write_blank_pdf("organized_pdfs/no_signature_fields/doc.pdf")
+    assert server.find_file_in_organized_folders("doc.pdf") == (
+        os.path.join("organized_pdfs", "no_signature_fields", "doc.pdf")
+    )
+    assert server.find_file_in_organized_folders("missing.pdf") is None
+
+
+def test_state_cache_drops_files_removed_by_hand(server):
+    add_unsigned(server, "keep.pdf")
+    gone = add_unsigned(server, "gone.pdf")
+    server.check_unsigned_folder_for_updates()
+
+    os.remove(gone)
+    server.check_unsigned_folder_for_updates()
+
+    cache = json.loads(Path(server.STATE_CACHE_FILE).read_text())
+    assert list(cache) == [os.path.join("organized_pdfs", "unsigned_fields", "keep.pdf")]
+    assert not os.path.exists(server.STATE_CACHE_FILE + ".tmp")
+
+
+def test_state_cache_drops_signed_files_removed_by_hand(server):
+    for name in ["first.pdf", "second.pdf"]:
+        sign_pdf(add_unsigned(server, name))
+        server.check_unsigned_folder_for_updates()
+        os.remove(os.path.join("organized_pdfs", "signed", name))
+
+    cache = json.loads(Path(server.STATE_CACHE_FILE).read_text())
+    assert list(cache) == [os.path.join("organized_pdfs", "signed", "second.pdf")]
+
+
+def test_reading_organized_resource_does_not_write_the_state_cache(server):
+    server.get_organized_pdfs()
+
+    assert not os.path.exists(server.STATE_CACHE_FILE)